@@ -1,88 +1,370 @@
 import os
+import sys
 from dotenv import load_dotenv
 import argparse
-import google.generativeai as genai
+import contextlib
+import errno
+from collections import Counter
 import json
-import PyPDF2
-from docx import Document
-import markdown
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
 from datetime import datetime
+import hashlib
 import shlex
+import shutil
 import subprocess
+import zipfile
+import xml.etree.ElementTree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+COMMANDS_CACHE_DIR = os.path.expanduser("~/.cache/llm-organizer")
+_VALID_EXTENSIONS = (".pdf", ".docx", ".txt", ".md")
+PROMPT_CONTENT_BUDGET = 6000  # characters of file content sent to Gemini in total
+
+_PROMPT_HEADER = """Generate file organization commands based on these requirements:
+
+SOURCE: {source}
+QUERY: {query}
+
+FILES:
+"""
+
+_PROMPT_FOOTER = """
+
+REQUIREMENTS:
+1. Return ONLY a JSON object without code fences or formatting
+2. JSON must have this exact structure:
+{
+    "explanation": "What the commands will do",
+    "commands": [
+        "mkdir -p folder_name",
+        "cp \\"./file.pdf\\" \\"./folder_name/\\""
+    ]
+}
+
+RULES:
+- Use only mkdir -p and cp commands
+- Always quote file paths
+- Use relative paths from source directory
+- No wildcards or complex commands
+- Target folder name should be simple (no spaces)
+- Each cp command copies one file"""
+
+
+def _json_dumps(obj, indent=True):
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+if orjson is not None:
+
+    def _dumps(obj, indent=True):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            # orjson rejects lone surrogates (e.g. undecodable filenames); json escapes them
+            return _json_dumps(obj, indent)
+
+    def _loads(data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+else:
+    _dumps = _json_dumps
+    _loads = json.loads
+
+
+@cache
+def _pdf_backend():
+    """Import the PDF library on first use: PyMuPDF, then pypdfium2, then PyPDF2."""
+    try:
+        import pymupdf
+
+        return "pymupdf", pymupdf
+    except ImportError:
+        pass
+    try:
+        import pypdfium2
+
+        return "pypdfium2", pypdfium2
+    except ImportError:
+        pass
+    import PyPDF2
+
+    return "pypdf2", PyPDF2
+
+
+class _PageFull(Exception):
+    """Raised from the PyPDF2 text visitor once enough text has been collected."""
+
+
+def _pdf_first_pages(path, n, max_chars=None):
+    """Return the text of the first n pages of a PDF, one string per page.
+
+    Extraction stops as soon as max_chars characters have been collected.
+    """
+    backend, lib = _pdf_backend()
+    budget = sys.maxsize if max_chars is None else max_chars
+    pages = []
+    if backend == "pymupdf":
+        with lib.open(path) as doc:
+            for i in range(min(n, doc.page_count)):
+                if budget <= 0:
+                    break
+                text = ""
+                for block in doc.load_page(i).get_text("blocks"):
+                    if block[6] != 0:  # skip image blocks
+                        continue
+                    text += block[4]
+                    if len(text) >= budget:
+                        break
+                pages.append(text[:budget])
+                budget -= len(pages[-1])
+        return pages
+    if backend == "pypdfium2":
+        pdf = lib.PdfDocument(path)
+        try:
+            for i in range(min(n, len(pdf))):
+                if budget <= 0:
+                    break
+                textpage = pdf[i].get_textpage()
+                count = min(budget, textpage.count_chars())
+                pages.append(textpage.get_text_range(count=count))
+                budget -= len(pages[-1])
+        finally:
+            pdf.close()
+        return pages
+    with open(path, "rb") as file:
+        reader = lib.PdfReader(file)
+        for i in range(min(n, len(reader.pages))):
+            if budget <= 0:
+                break
+            parts = []
+            collected = 0
+
+            def visit(text, cm, tm, font_dict, font_size):
+                nonlocal collected
+                parts.append(text)
+                collected += len(text)
+                if collected >= budget:
+                    raise _PageFull
+
+            try:
+                text = reader.pages[i].extract_text(visitor_text=visit)
+            except _PageFull:
+                text = "".join(parts)
+            pages.append(text[:budget])
+            budget -= len(pages[-1])
+    return pages
+
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _docx_paragraphs(path, max_paras):
+    """Return the text of the first max_paras body paragraphs of a .docx file.
+
+    word/document.xml is streamed and parsing stops at the last paragraph needed.
+    """
+    paragraphs = []
+    depth = 0
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 2:
+                continue
+            # document > body > p: top-level paragraphs only, as python-docx does
+            if el.tag == _W_NS + "p":
+                text = ""
+                for node in el.iter():
+                    if node.tag == _W_NS + "t":
+                        text += node.text or ""
+                    elif node.tag == _W_NS + "tab":
+                        text += "\t"
+                    elif node.tag in (_W_NS + "br", _W_NS + "cr"):
+                        text += "\n"
+                paragraphs.append(text)
+                if len(paragraphs) >= max_paras:
+                    break
+            el.clear()
+    return paragraphs
 
 
 class DocumentAnalyzer:
     def __init__(self):
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in .env")
+        # Imported here so walking and extraction never pay for the SDK
+        import google.generativeai as genai
+
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel("gemini-pro")
+        self.commands_cache_path = None
 
-    def extract_content(self, file_path):
+    @staticmethod
+    def extract_content(file_path, raise_errors=False):
         _, ext = os.path.splitext(file_path)
         ext = ext.lower()
 
         try:
             if ext == ".pdf":
-                with open(file_path, "rb") as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    # Get first 3 pages or all pages if less than 3
-                    for page_num in range(min(3, len(reader.pages))):
-                        text += f"\n=== Page {page_num + 1} ===\n"
-                        text += reader.pages[page_num].extract_text()
-                    return text
+                text = ""
+                # Get first 3 pages or all pages if less than 3
+                pages = _pdf_first_pages(file_path, 3, max_chars=10000)
+                for page_num, page_text in enumerate(pages):
+                    text += f"\n=== Page {page_num + 1} ===\n"
+                    text += page_text
+                return text
             elif ext == ".docx":
-                doc = Document(file_path)
                 return "\n".join(
-                    [p.text for p in doc.paragraphs[:30]]
+                    _docx_paragraphs(file_path, max_paras=30)
                 )  # Increased from 10
             elif ext in [".txt", ".md"]:
                 with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
                     return file.read(10000)  # Increased from 2000
             return ""
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Warning: Cannot read {file_path}: {str(e)}")
             return ""
 
     def get_files_metadata(self, source_dir, depth=1):
         files_metadata = []
-        valid_extensions = {".pdf", ".docx", ".txt", ".md"}
         log_entries = []
 
         source_dir = os.path.expanduser(source_dir)
-        for root, _, files in os.walk(source_dir):
-            if root[len(source_dir) :].count(os.sep) > depth:
+        cache_path = os.path.join(source_dir, "file_analysis.jsonl")
+        paths = []
+        stats = {}
+        for entry in _walk(source_dir, depth, _VALID_EXTENSIONS):
+            # The file may vanish or its symlink target become unreadable mid-walk
+            try:
+                stats[entry.path] = entry.stat()
+            except OSError as e:
+                log_entries.append(f"\nERROR processing {entry.path}: {str(e)}\n")
                 continue
-
-            for file in files:
-                if os.path.splitext(file)[1].lower() not in valid_extensions:
-                    continue
-
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, source_dir)
-
-                try:
-                    content = self.extract_content(file_path)
-                    metadata = {
-                        "filename": file,
-                        "absolute_path": file_path,
-                        "relative_path": rel_path,
-                        "content": content,
-                        "extension": os.path.splitext(file)[1].lower(),
-                        "directory": os.path.dirname(rel_path),
-                    }
-                    files_metadata.append(metadata)
-
-                    # Add to log
-                    log_entries.append(
-                        f"\n{'='*80}\nFile: {file_path}\nContent Preview:\n{content[:500]}...\n{'='*80}\n"
-                    )
-                except Exception as e:
-                    log_entries.append(f"\nERROR processing {file_path}: {str(e)}\n")
+            paths.append(entry.path)
+
+        # Only re-extract files whose size or mtime changed since the last run
+        wanted = {os.path.relpath(p, source_dir) for p in paths}
+        prev_entries = {
+            m["relative_path"]: m
+            for m in _iter_metadata_cache(cache_path)
+            if m.get("relative_path") in wanted
+        }
+        results = {}
+        stale = []
+        for file_path in paths:
+            st = stats[file_path]
+            prev = prev_entries.get(os.path.relpath(file_path, source_dir))
+            if (
+                prev
+                and prev.get("size") == st.st_size
+                and prev.get("mtime") == st.st_mtime
+            ):
+                # Path fields are rebuilt, since the directory may have moved since
+                metadata = _file_metadata(file_path, source_dir, prev["content"])
+                for key in ("mtime", "size", "sha256"):
+                    if key in prev:
+                        metadata[key] = prev[key]
+                results[file_path] = metadata, _log_entry(file_path, prev["content"])
+            else:
+                stale.append(file_path)
+
+        # Identical files share one extraction. Only a file whose size matches another
+        # file's can be a duplicate, so only those are hashed (in the workers).
+        by_hash = {
+            _dedupe_key(m["relative_path"], m["sha256"]): m
+            for m in prev_entries.values()
+            if m.get("sha256")
+        }
+        unhashed = [p for p, (m, _) in results.items() if not m.get("sha256")]
+        sizes = Counter(stats[p].st_size for p in stale)
+        sizes.update(m.get("size") for m in by_hash.values())
+        sizes.update(stats[p].st_size for p in unhashed)
+        to_hash = [p for p in stale if sizes[stats[p].st_size] > 1]
+        # Unchanged files indexed before they had a twin are hashed now, so a new
+        # copy of them is still recognised
+        colliding = {stats[p].st_size for p in to_hash}
+        to_hash += [p for p in unhashed if stats[p].st_size in colliding]
+        digests = dict(zip(to_hash, _parallel_map(_file_sha256, to_hash)))
+        for file_path in unhashed:
+            if digests.get(file_path):
+                metadata = results[file_path][0]
+                metadata["sha256"] = digests[file_path]
+                by_hash[_dedupe_key(file_path, digests[file_path])] = metadata
+
+        extract = []
+        duplicates = []
+        for file_path in stale:
+            digest = digests.get(file_path)
+            if digest is None:
+                extract.append(file_path)
+            elif _dedupe_key(file_path, digest) in by_hash:
+                duplicates.append(file_path)
+            else:
+                # Reserve the key so later copies in this walk wait for this one
+                by_hash[_dedupe_key(file_path, digest)] = None
+                extract.append(file_path)
+
+        # Extraction is independent per file, so spread it across processes
+        analyze = partial(_analyze_one, source_dir=source_dir)
+        for file_path, (metadata, log_entry) in zip(
+            extract, _parallel_map(analyze, extract)
+        ):
+            if metadata is not None and "error" not in metadata:
+                metadata["mtime"] = stats[file_path].st_mtime
+                metadata["size"] = stats[file_path].st_size
+                if digests.get(file_path):
+                    metadata["sha256"] = digests[file_path]
+                    by_hash[_dedupe_key(file_path, digests[file_path])] = metadata
+            results[file_path] = metadata, log_entry
+
+        for file_path in duplicates:
+            original = by_hash[_dedupe_key(file_path, digests[file_path])]
+            if original is None:
+                # The first copy failed, and identical bytes would fail the same way
+                metadata = _file_metadata(file_path, source_dir, "")
+                metadata["error"] = "duplicate of unreadable file"
+                results[file_path] = (
+                    metadata,
+                    f"\nERROR processing {file_path}: {metadata['error']}\n",
+                )
+                continue
+            metadata = _file_metadata(file_path, source_dir, original["content"])
+            metadata["mtime"] = stats[file_path].st_mtime
+            metadata["size"] = stats[file_path].st_size
+            metadata["sha256"] = digests[file_path]
+            results[file_path] = metadata, _log_entry(file_path, metadata["content"])
+
+        for file_path in paths:
+            metadata, log_entry = results[file_path]
+            if metadata is not None:
+                files_metadata.append(metadata)
+            log_entries.append(log_entry)
+
+        # Failed extractions stay in this run but are retried next time
+        _save_metadata_cache(
+            cache_path, [m for m in files_metadata if "error" not in m]
+        )
 
         # Write log file
         log_path = os.path.join(source_dir, "file_analysis.log")
@@ -92,39 +374,37 @@ class DocumentAnalyzer:
         print(f"\nDetailed analysis log written to: {log_path}")
         return files_metadata, source_dir
 
-    def generate_commands(self, source_dir, query, depth):
+    def generate_commands(self, source_dir, query, depth, use_cache=True):
         files_metadata, abs_source = self.get_files_metadata(source_dir, depth)
 
-        prompt = f"""Generate file organization commands based on these requirements:
-
-SOURCE: {abs_source}
-QUERY: {query}
-
-FILES:
-{json.dumps([{
-    "name": m["filename"],
-    "path": m["relative_path"],
-    "content": m["content"] + "..." if m["content"] else ""
-} for m in files_metadata], indent=2)}
-
-REQUIREMENTS:
-1. Return ONLY a JSON object without code fences or formatting
-2. JSON must have this exact structure:
-{{
-    "explanation": "What the commands will do",
-    "commands": [
-        "mkdir -p folder_name",
-        "cp \\"./file.pdf\\" \\"./folder_name/\\""
-    ]
-}}
-
-RULES:
-- Use only mkdir -p and cp commands
-- Always quote file paths
-- Use relative paths from source directory
-- No wildcards or complex commands
-- Target folder name should be simple (no spaces)
-- Each cp command copies one file"""
+        # Identical query over an unchanged file set: reuse the earlier answer
+        cache_path = _commands_cache_path(abs_source, query, files_metadata)
+        self.commands_cache_path = cache_path
+        if use_cache:
+            try:
+                with open(cache_path, "rb") as f:
+                    cached = _loads(f.read())
+                if _valid_commands(cached):
+                    print(f"\nUsing cached commands from: {cache_path}")
+                    return cached
+            except (OSError, ValueError):
+                pass
+
+        # Split a fixed content budget across files so the prompt size stays bounded
+        per_file = PROMPT_CONTENT_BUDGET // max(len(files_metadata), 1)
+        files = [
+            {
+                "name": m["filename"],
+                "path": m["relative_path"],
+                "content": m["content"][:per_file],
+            }
+            for m in files_metadata
+        ]
+        prompt = (
+            _PROMPT_HEADER.format(source=abs_source, query=query)
+            + _dumps(files, indent=False).decode()
+            + _PROMPT_FOOTER
+        )
 
         try:
             response = self.model.generate_content(prompt)
@@ -132,16 +412,202 @@ RULES:
             text = response.text.strip()
             if text.startswith("```"):
                 text = text[text.find("{") : text.rfind("}") + 1]
-            return json.loads(text)
+            result = json.loads(text)
+            if not _valid_commands(result):
+                raise ValueError("expected an object with explanation and commands")
         except Exception as e:
             print(f"Error parsing response: {str(e)}")
             print(f"Raw response:\n{response.text}")
             return {"explanation": "Failed to generate valid commands", "commands": []}
 
+        try:
+            os.makedirs(COMMANDS_CACHE_DIR, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                f.write(_dumps(result))
+        except OSError as e:
+            print(f"Warning: Cannot write command cache {cache_path}: {str(e)}")
+        return result
+
+
+def _valid_commands(result):
+    """Whether a parsed response has the explanation/commands shape main() expects."""
+    return (
+        isinstance(result, dict)
+        and isinstance(result.get("explanation"), str)
+        and isinstance(result.get("commands"), list)
+        and all(isinstance(cmd, str) for cmd in result["commands"])
+    )
+
+
+def _walk(root, depth, suffixes):
+    """Yield DirEntry objects for files at most depth directories below root.
+
+    Only files whose lowercased name ends with one of suffixes are yielded.
+    """
+    stack = [(root, 0)]
+    while stack:
+        directory, level = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if level < depth:
+                            stack.append((entry.path, level + 1))
+                    elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                        yield entry
+        except OSError:
+            continue
+
+
+def _log_entry(file_path, content):
+    return f"\n{'='*80}\nFile: {file_path}\nContent Preview:\n{content[:500]}...\n{'='*80}\n"
+
+
+def _iter_metadata_cache(cache_path):
+    """Stream entries from the per-directory metadata cache, one JSON object per line."""
+    try:
+        with open(cache_path, "rb") as f:
+            for line in f:
+                try:
+                    yield _loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
+
+
+def _save_metadata_cache(cache_path, entries):
+    try:
+        with open(cache_path, "wb") as f:
+            for entry in entries:
+                f.write(_dumps(entry, indent=False) + b"\n")
+    except OSError as e:
+        print(f"Warning: Cannot write metadata cache {cache_path}: {str(e)}")
+
+
+def _commands_cache_path(abs_source, query, files_metadata):
+    """Cache file for a query, keyed on the source and each file's path and mtime."""
+    files = sorted((m["relative_path"], m.get("mtime", 0)) for m in files_metadata)
+    key = hashlib.sha256(
+        (query + "|" + abs_source + "|" + json.dumps(files)).encode()
+    ).hexdigest()
+    return os.path.join(COMMANDS_CACHE_DIR, f"{key}.json")
+
+
+def _file_sha256(path):
+    """Return the file's sha256 hex digest, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+            return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def _dedupe_key(path, digest):
+    """Duplicate key: files share an extraction only if they are read the same way."""
+    ext = os.path.splitext(path)[1].lower()
+    return ("text" if ext in (".txt", ".md") else ext), digest
+
+
+def _parallel_map(fn, items):
+    """Map fn over items in worker processes, or inline when one worker is enough."""
+    workers = min(os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, items, chunksize=chunksize))
+
+
+def _file_metadata(file_path, source_dir, content):
+    rel_path = os.path.relpath(file_path, source_dir)
+    filename = os.path.basename(file_path)
+    return {
+        "filename": filename,
+        "absolute_path": file_path,
+        "relative_path": rel_path,
+        "content": content,
+        "extension": os.path.splitext(filename)[1].lower(),
+        "directory": os.path.dirname(rel_path),
+    }
+
+
+def _analyze_one(file_path, source_dir):
+    """Extract one file's metadata in a worker process; returns (metadata, log_entry).
+
+    A failed extraction still yields metadata with empty content, marked with an
+    "error" key so it is never written to the cache.
+    """
+    try:
+        content = DocumentAnalyzer.extract_content(file_path, raise_errors=True)
+    except Exception as e:
+        print(f"Warning: Cannot read {file_path}: {str(e)}")
+        metadata = _file_metadata(file_path, source_dir, "")
+        metadata["error"] = str(e)
+        return metadata, f"\nERROR processing {file_path}: {str(e)}\n"
+    return _file_metadata(file_path, source_dir, content), _log_entry(
+        file_path, content
+    )
+
+
+# Devices whose filesystem rejected FICLONE; later copies there skip the attempt
+_NO_REFLINK_DEVS = set()
+_NO_REFLINK_ERRNOS = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY}
+
+
+def _clone_file(src, dst):
+    """Reflink src onto dst; returns False if the clone could not be made."""
+    if not hasattr(fcntl, "FICLONE"):
+        return False
+    try:
+        dev = os.stat(os.path.dirname(dst) or ".").st_dev
+        if dev in _NO_REFLINK_DEVS:
+            return False
+        existed = os.path.exists(dst)
+        # An existing dst is cloned into in place (through links, like cp) and only
+        # truncated once the clone succeeded; a new dst is removed again on failure
+        flags = os.O_WRONLY if existed else os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        fd = os.open(dst, flags, 0o666)
+    except OSError:
+        return False
+    try:
+        with open(src, "rb") as fsrc:
+            fcntl.ioctl(fd, fcntl.FICLONE, fsrc.fileno())
+            os.ftruncate(fd, os.fstat(fsrc.fileno()).st_size)
+    except OSError as e:
+        if e.errno in _NO_REFLINK_ERRNOS:
+            _NO_REFLINK_DEVS.add(dev)
+        if not existed:
+            with contextlib.suppress(OSError):
+                os.unlink(dst)
+        return False
+    finally:
+        os.close(fd)
+    if not existed:
+        shutil.copymode(src, dst)
+    return True
+
+
+def _copy_file(src, dst):
+    """Copy src to dst like `cp`, cloning the data when the filesystem allows it."""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    if not _clone_file(src, dst):
+        # shutil uses copy_file_range/sendfile on Linux, so the data stays in-kernel
+        shutil.copy(src, dst)
+
 
 def safe_execute(source_dir, commands):
     source_dir = os.path.expanduser(source_dir)
     os.chdir(source_dir)
+    created = set()
 
     for cmd in commands:
         try:
@@ -154,8 +620,21 @@ def safe_execute(source_dir, commands):
                 print(f"Skipping unauthorized command: {cmd}")
                 continue
 
-            subprocess.run(parts, check=True)
-        except subprocess.CalledProcessError as e:
+            # Run plain mkdir/cp in-process; any other flags still go through subprocess
+            flags = [p for p in parts[1:] if p.startswith("-")]
+            args = [p for p in parts[1:] if not p.startswith("-")]
+            if parts[0] == "mkdir" and set(flags) <= {"-p"}:
+                for target in args:
+                    if not flags:
+                        os.mkdir(target)
+                    elif target not in created:
+                        os.makedirs(target, exist_ok=True)
+                        created.add(target)
+            elif parts[0] == "cp" and not flags and len(args) == 2:
+                _copy_file(args[0], args[1])
+            else:
+                subprocess.run(parts, check=True)
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"Command failed: {cmd}")
             print(f"Error: {e}")
             return False
@@ -167,11 +646,16 @@ def main():
     parser.add_argument("--source", required=True, help="Source directory")
     parser.add_argument("--query", required=True, help="Organization query")
     parser.add_argument("--depth", type=int, default=1, help="Directory depth")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore cached commands"
+    )
 
     args = parser.parse_args()
 
     analyzer = DocumentAnalyzer()
-    result = analyzer.generate_commands(args.source, args.query, args.depth)
+    result = analyzer.generate_commands(
+        args.source, args.query, args.depth, use_cache=not args.no_cache
+    )
 
     print("\nPlan:")
     print(result["explanation"])
@@ -184,6 +668,10 @@ def main():
             print("Complete!")
         else:
             print("Failed.")
+    elif analyzer.commands_cache_path:
+        # Don't replay a rejected plan on the next run
+        with contextlib.suppress(OSError):
+            os.remove(analyzer.commands_cache_path)
 
 
 if __name__ == "__main__":